@@ -1,29 +1,50 @@
 import asyncio
+from collections.abc import Callable
 from typing import Any
 
+import httpx
 from griptape.artifacts import ImageUrlArtifact
 from griptape_nodes.exe_types.core_types import (
     Parameter,
     ParameterMode,
     ParameterTypeBuiltin,
 )
-from griptape_nodes.exe_types.node_types import AsyncResult, ControlNode
 from griptape_nodes.exe_types.param_components.artifact_url.public_artifact_url_parameter import (
     PublicArtifactUrlParameter,
 )
 from griptape_nodes.exe_types.param_components.project_file_parameter import ProjectFileParameter
-from griptape_nodes.files.file import File
-from griptape_nodes.retained_mode.griptape_nodes import GriptapeNodes
 from griptape_nodes.traits.options import Options
-from luma_agents import AsyncLuma
+from luma_base import (
+    API_KEY_ENV_VAR,
+    DOWNLOAD_DEADLINE,
+    LumaNode,
+    gather_settled,
+    get_http_client,
+    get_luma_client,
+    lookup_api_key,
+)
+
+# Transient network failures (connection resets, timeouts) are retried with exponential backoff.
+DOWNLOAD_ATTEMPTS = 3
+DOWNLOAD_RETRY_DELAY = 0.5
 
-SERVICE = "Luma Labs"
-API_KEY_ENV_VAR = "LUMA_AGENTS_API_KEY"
+# Status label and request-field builder for each reference type, keyed by the reference_type value.
+REFERENCE_TYPE_PARAMS: dict[str, tuple[str, Callable[[str], dict[str, Any]]]] = {
+    # Reference image guides a fresh generation
+    "image_reference": ("Using image reference", lambda url: {"image_ref": [{"url": url}]}),
+    # Edit the reference image directly
+    "modify_image": ("Modifying image", lambda url: {"type": "image_edit", "source": {"url": url}}),
+}
 
 
-class LumaImageGeneration(ControlNode):
+class LumaImageGeneration(LumaNode):
     """Luma Labs image generation node supporting text-to-image, image references, and image editing."""
 
+    # Most images finish within seconds, so start polling sooner and give up sooner than for video.
+    POLL_INITIAL_DELAY = 0.5
+    POLL_MAX_DELAY = 4.0
+    POLL_TIMEOUT = 240.0
+
     def __init__(self, name: str, metadata: dict[Any, Any] | None = None) -> None:
         super().__init__(name, metadata)
 
@@ -149,30 +170,25 @@ class LumaImageGeneration(ControlNode):
     def after_value_set(self, parameter: Parameter, value: Any) -> None:
         """Update parameter visibility when reference type changes."""
         if parameter.name == "reference_type":
-            if value == "none":
+            hide_reference = value == "none"
+            reference_image = self.get_parameter_by_name("reference_image")
+            # Skip no-op toggles; each visibility change publishes a UI update
+            if reference_image is None or reference_image.hide == hide_reference:
+                return
+            if hide_reference:
                 self.hide_parameter_by_name(["reference_image"])
             else:
                 self.show_parameter_by_name(["reference_image"])
 
-    def _get_api_key(self) -> str:
-        """Retrieve the Luma API key from configuration."""
-        api_key = GriptapeNodes.SecretsManager().get_secret(API_KEY_ENV_VAR)
-        if not api_key:
-            raise ValueError(
-                f"Luma API key not found. Please set the {API_KEY_ENV_VAR} environment variable.\n"
-                "Get your API key from: https://platform.lumalabs.ai"
-            )
-        return api_key
-
     def validate_before_node_run(self) -> list[Exception] | None:
         """Validate node configuration before execution."""
         errors = []
 
-        prompt = self.get_parameter_value("prompt")
+        prompt = (self.get_parameter_value("prompt") or "").strip()
         if not prompt:
             errors.append(ValueError(f"{self.name}: Provide a prompt for image generation."))
 
-        api_key = GriptapeNodes.SecretsManager().get_secret(API_KEY_ENV_VAR)
+        api_key = lookup_api_key()
         if not api_key:
             errors.append(
                 ValueError(
@@ -182,30 +198,13 @@ class LumaImageGeneration(ControlNode):
 
         return errors if errors else None
 
-    def validate_before_workflow_run(self) -> list[Exception] | None:
-        return self.validate_before_node_run()
-
-    def process(self) -> AsyncResult[None]:
-        """Non-blocking entry point for Griptape engine."""
-        yield lambda: self._process_sync()
-
-    def _process_sync(self) -> None:
-        """Synchronous wrapper that runs async code."""
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            loop.run_until_complete(self._process_async())
-        finally:
-            loop.close()
+    # Workflow-level validation checks the same things as node-level validation
+    validate_before_workflow_run = validate_before_node_run
 
     async def _process_async(self) -> None:
         """Generate image using Luma async API."""
-        client = None
         try:
-            api_key = self._get_api_key()
-            client = AsyncLuma(auth_token=api_key)
-
-            prompt = self.get_parameter_value("prompt")
+            prompt = (self.get_parameter_value("prompt") or "").strip()
             if not prompt:
                 raise ValueError("Prompt is required and cannot be empty")
 
@@ -214,51 +213,25 @@ class LumaImageGeneration(ControlNode):
 
             self.append_value_to_parameter("status", "Creating generation request...\n")
 
-            # Build request parameters. Default to a text-to-image generation.
+            # The secrets lookup may read .env files from disk; overlap it with reference image resolution,
+            # which may upload the image to a public URL. Wait for both to settle, so a failed lookup can't
+            # leave an upload running past the cleanup below.
+            api_key, reference_fields = await gather_settled(
+                asyncio.to_thread(self._get_api_key),
+                self._resolve_reference_fields(),
+            )
+            client = get_luma_client(api_key)
+
+            # Build request parameters in one go. Default to a text-to-image generation; the reference
+            # fields may switch the type to an image edit.
             params = {
                 "type": "image",
-                "prompt": prompt.strip(),
+                "prompt": prompt,
                 "model": model,
                 "aspect_ratio": aspect_ratio,
+                **reference_fields,
             }
 
-            # Add reference image based on selected type
-            reference_type = self.get_parameter_value("reference_type")
-
-            if reference_type != "none":
-                # Convert serialized dict back to artifact if needed
-                reference_image = self.get_parameter_value("reference_image")
-
-                # Only process if we have a reference image
-                if not reference_image:
-                    self.append_value_to_parameter(
-                        "status",
-                        f"⚠️ Reference type set to '{reference_type}' but no reference image provided. Proceeding without reference.\n",
-                    )
-                else:
-                    if isinstance(reference_image, dict) and reference_image.get("value"):
-                        # Create proper artifact from serialized dict
-                        reference_image = ImageUrlArtifact(
-                            value=reference_image["value"], name=reference_image.get("name", "reference_image")
-                        )
-                        # Update the parameter with the artifact object
-                        self.set_parameter_value("reference_image", reference_image)
-
-                    # Let PublicArtifactUrlParameter handle getting and converting the artifact
-                    reference_url = self._public_reference_image_parameter.get_public_url_for_parameter()
-
-                    if reference_url:
-                        if reference_type == "image_reference":
-                            # Reference image guides a fresh generation
-                            params["image_ref"] = [{"url": reference_url}]
-                            self.append_value_to_parameter("status", f"Using image reference: {reference_url}\n")
-
-                        elif reference_type == "modify_image":
-                            # Edit the reference image directly
-                            params["type"] = "image_edit"
-                            params["source"] = {"url": reference_url}
-                            self.append_value_to_parameter("status", f"Modifying image: {reference_url}\n")
-
             # Create generation
             generation = await client.generations.create(**params)
             generation_id = generation.id
@@ -268,36 +241,20 @@ class LumaImageGeneration(ControlNode):
             # Poll for completion
             self.append_value_to_parameter("status", "Waiting for generation to complete...\n")
 
-            completed = False
-            max_attempts = 120
-            attempt = 0
-
-            while not completed and attempt < max_attempts:
-                await asyncio.sleep(2)
-                attempt += 1
-
-                generation = await client.generations.get(generation_id=generation_id)
-
-                if generation.state == "completed":
-                    completed = True
-                    self.append_value_to_parameter("status", f"Attempt {attempt}: Completed!\n")
-                elif generation.state == "failed":
-                    raise RuntimeError(f"Generation failed: {generation.failure_reason}")
-                else:
-                    self.append_value_to_parameter("status", f"Attempt {attempt}: {generation.state}\n")
-
-            if not completed:
-                raise TimeoutError(f"Generation timed out after {max_attempts} attempts")
+            generation = await self._wait_for_generation(client, generation_id)
 
             # Download and save image from the generation output list
             image_url = generation.output[0].url
 
             self.append_value_to_parameter("status", "Downloading generated image...\n")
-            image_bytes = self._download_image(image_url)
 
-            # Save to project files
-            dest = self._output_file.build_file()
-            saved = dest.write_bytes(image_bytes)
+            # Save to project files. Resolving the destination and writing go through the engine's
+            # synchronous request handlers, so run them in worker threads alongside the download.
+            dest, image_bytes = await asyncio.gather(
+                asyncio.to_thread(self._output_file.build_file),
+                self._download_image(image_url),
+            )
+            saved = await asyncio.to_thread(dest.write_bytes, image_bytes)
 
             image_artifact = ImageUrlArtifact(value=saved.location, name=saved.name)
             self.set_parameter_value("image", image_artifact)
@@ -308,17 +265,55 @@ class LumaImageGeneration(ControlNode):
             )
 
         except Exception as e:
-            error_msg = f"❌ Generation failed: {str(e)}\n"
-            self.append_value_to_parameter("status", error_msg)
+            self._report_failure(e)
             raise
         finally:
-            # Close the async client while the event loop is still alive to avoid
-            # "Event loop is closed" errors when httpx is finalized during GC.
-            if client is not None:
-                await client.close()
             # Cleanup uploaded artifacts
-            self._public_reference_image_parameter.delete_uploaded_artifact()
+            await self._delete_uploaded_artifacts(self._public_reference_image_parameter)
+
+    async def _resolve_reference_fields(self) -> dict[str, Any]:
+        """Resolve the reference image to a public URL and return the request fields for the reference type."""
+        reference_fields: dict[str, Any] = {}
+        reference_type = self.get_parameter_value("reference_type")
 
-    def _download_image(self, image_url: str) -> bytes:
+        if reference_type != "none":
+            # Resolve the reference image to a public URL, uploading it if needed
+            reference_url = await self._get_public_url(
+                "reference_image", self._public_reference_image_parameter, ImageUrlArtifact
+            )
+
+            # Only process if we have a reference image
+            if not reference_url:
+                self.append_value_to_parameter(
+                    "status",
+                    f"⚠️ Reference type set to '{reference_type}' but no reference image provided. Proceeding without reference.\n",
+                )
+            else:
+                reference_handler = REFERENCE_TYPE_PARAMS.get(reference_type)
+                if reference_handler:
+                    status_label, build_fields = reference_handler
+                    reference_fields = build_fields(reference_url)
+                    self.append_value_to_parameter("status", f"{status_label}: {reference_url}\n")
+
+        return reference_fields
+
+    async def _download_image(self, image_url: str) -> bytes:
         """Download image from URL and return bytes."""
-        return File(image_url).read_bytes()
+        # Images are not streamed to disk in chunks: the engine's file writer may embed workflow
+        # metadata into image files, which requires the complete image in a single write.
+        client = get_http_client()
+        try:
+            async with asyncio.timeout(DOWNLOAD_DEADLINE):
+                for attempt in range(DOWNLOAD_ATTEMPTS - 1):
+                    try:
+                        response = await client.get(image_url)
+                        break
+                    except httpx.TransportError:
+                        await asyncio.sleep(DOWNLOAD_RETRY_DELAY * 2**attempt)
+                else:
+                    # Last attempt: let a transport error propagate
+                    response = await client.get(image_url)
+        except TimeoutError as e:
+            raise TimeoutError(f"Image download did not finish within {DOWNLOAD_DEADLINE:.0f} seconds") from e
+        response.raise_for_status()
+        return response.content
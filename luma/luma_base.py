@@ -0,0 +1,261 @@
+import asyncio
+import logging
+import os
+import random
+import shutil
+import tempfile
+import time
+import weakref
+from collections.abc import Awaitable
+from pathlib import Path
+from typing import Any, BinaryIO
+
+import httpx
+from griptape.artifacts import UrlArtifact
+from griptape_nodes.exe_types.node_types import ControlNode
+from griptape_nodes.exe_types.param_components.artifact_url.public_artifact_url_parameter import (
+    PublicArtifactUrlParameter,
+)
+from griptape_nodes.files.file import File, FileDestination
+from griptape_nodes.retained_mode.griptape_nodes import GriptapeNodes
+from luma_agents import APIConnectionError, AsyncLuma
+from luma_agents.types import Generation
+
+logger = logging.getLogger("griptape_nodes")
+
+SERVICE = "Luma Labs"
+API_KEY_ENV_VAR = "LUMA_AGENTS_API_KEY"
+DOWNLOAD_TIMEOUT = 60.0
+# Keep idle connections to the CDN open between runs so repeat downloads skip the TLS handshake.
+DOWNLOAD_LIMITS = httpx.Limits(max_keepalive_connections=8, keepalive_expiry=60.0)
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+# DOWNLOAD_TIMEOUT bounds each network operation; this bounds the whole download, so a slow trickle
+# from the CDN can't keep the node running indefinitely.
+DOWNLOAD_DEADLINE = 600.0
+
+# Each poll delay grows by POLL_BACKOFF up to the node's POLL_MAX_DELAY. Jitter keeps several nodes
+# started together from polling in lockstep.
+POLL_BACKOFF = 1.5
+POLL_JITTER = 0.25
+# Per-attempt status lines are coalesced into at most one UI update per interval.
+STATUS_FLUSH_INTERVAL = 1.0
+
+# httpx clients (including the one inside AsyncLuma) are bound to the event loop that created them,
+# so keep the shared clients per loop.
+_HTTP_CLIENTS: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient] = weakref.WeakKeyDictionary()
+_LUMA_CLIENTS: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, AsyncLuma]] = weakref.WeakKeyDictionary()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared download client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _HTTP_CLIENTS.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(timeout=DOWNLOAD_TIMEOUT, limits=DOWNLOAD_LIMITS, follow_redirects=True)
+        _HTTP_CLIENTS[loop] = client
+    return client
+
+
+def get_luma_client(api_key: str) -> AsyncLuma:
+    """Return a Luma client for the running event loop, reusing its connection pool across runs."""
+    clients = _LUMA_CLIENTS.setdefault(asyncio.get_running_loop(), {})
+    client = clients.get(api_key)
+    if client is None or client.is_closed():
+        client = AsyncLuma(auth_token=api_key)
+        clients[api_key] = client
+    return client
+
+
+def lookup_api_key() -> str | None:
+    """Return the Luma API key from the environment or the secrets manager."""
+    # The secrets manager loads its .env files into the environment and reloads them when a secret is
+    # changed, so the environment is both the cheapest and the most current place to look. Nothing is
+    # cached here, so a key changed in settings is used on the next run.
+    return os.environ.get(API_KEY_ENV_VAR) or GriptapeNodes.SecretsManager().get_secret(API_KEY_ENV_VAR)
+
+
+def is_public_url(url: str) -> bool:
+    """Return True if PublicArtifactUrlParameter would pass the URL through without uploading it."""
+    # Same test as get_public_url_for_parameter, so skipping it here never changes which URL Luma receives
+    return url.startswith(("http://", "https://")) and "localhost" not in url
+
+
+def get_artifact_url(value: Any) -> str | None:
+    """Return the URL held by an artifact, its serialized dict, or a plain string value."""
+    if isinstance(value, dict):
+        value = value.get("value")
+    elif isinstance(value, UrlArtifact):
+        value = value.value
+    return value if isinstance(value, str) else None
+
+
+async def gather_settled(*awaitables: Awaitable[Any]) -> list[Any]:
+    """Run awaitables concurrently and return their results, raising the first failure once all have finished.
+
+    A plain gather raises as soon as one fails and leaves the rest running. Uploads still in flight
+    would then finish after the caller's cleanup and never be deleted.
+    """
+    results = await asyncio.gather(*awaitables, return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return results
+
+
+def _open_partial_file(dest: FileDestination) -> tuple[Path, BinaryIO]:
+    """Create a hidden file beside the destination to download into, returning its path and open handle."""
+    directory = Path(dest.resolve()).parent
+    directory.mkdir(parents=True, exist_ok=True)
+    fd, path = tempfile.mkstemp(prefix=".", suffix=".part", dir=directory)
+    return Path(path), os.fdopen(fd, "wb")
+
+
+class LumaNode(ControlNode):
+    """Base class for Luma nodes: API access, input uploads, generation polling and status reporting.
+
+    Subclasses build and submit the request in `_process_async`, then hand the generation to
+    `_wait_for_generation` and fetch its output.
+    """
+
+    # Noun used in status and error messages, e.g. "Reframe failed: ..."
+    OPERATION = "Generation"
+
+    # Poll quickly at first, then back off to limit API traffic while long generations run.
+    POLL_INITIAL_DELAY = 1.0
+    POLL_MAX_DELAY = 8.0
+    POLL_TIMEOUT = 540.0
+
+    def __init__(self, name: str, metadata: dict[Any, Any] | None = None) -> None:
+        super().__init__(name, metadata)
+
+        self._status_buffer: list[str] = []
+        self._status_last_flush = 0.0
+
+    def _get_api_key(self) -> str:
+        """Retrieve the Luma API key from configuration."""
+        api_key = lookup_api_key()
+        if not api_key:
+            raise ValueError(
+                f"Luma API key not found. Please set the {API_KEY_ENV_VAR} environment variable.\n"
+                "Get your API key from: https://platform.lumalabs.ai"
+            )
+        return api_key
+
+    async def aprocess(self) -> None:
+        """Run the node directly on the engine's event loop."""
+        await self._process_async()
+
+    async def _process_async(self) -> None:
+        raise NotImplementedError
+
+    async def _get_public_url(
+        self, name: str, public_parameter: PublicArtifactUrlParameter, artifact_type: type[UrlArtifact]
+    ) -> str | None:
+        """Return a URL the Luma API can fetch for the named artifact parameter, or None if it is unset."""
+        value = self.get_parameter_value(name)
+        if not value:
+            return None
+
+        # Public URLs can be passed straight through without an upload round trip
+        url = get_artifact_url(value)
+        if url and is_public_url(url):
+            return url
+
+        # Convert serialized dict back to artifact so PublicArtifactUrlParameter can read it
+        if isinstance(value, dict) and value.get("value"):
+            self.set_parameter_value(name, artifact_type(value=value["value"], name=value.get("name", name)))
+
+        # Uploading a local file is a blocking call, so keep it off the event loop
+        return await asyncio.to_thread(public_parameter.get_public_url_for_parameter)
+
+    async def _delete_uploaded_artifacts(self, *parameters: PublicArtifactUrlParameter) -> None:
+        """Delete the temporary public copies of uploaded inputs, logging rather than raising failures."""
+        # Runs from `finally`: a failed delete must not mask the run's own exception or leave the
+        # other deletes unobserved.
+        results = await asyncio.gather(
+            *(asyncio.to_thread(parameter.delete_uploaded_artifact) for parameter in parameters),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning("%s: failed to delete uploaded artifact: %s", self.name, result)
+
+    async def _wait_for_generation(self, client: AsyncLuma, generation_id: str) -> Generation:
+        """Poll the generation with backoff until it completes, returning the completed generation."""
+        attempt = 0
+        delay = self.POLL_INITIAL_DELAY
+        deadline = time.monotonic() + self.POLL_TIMEOUT
+        self._status_buffer.clear()
+        self._status_last_flush = time.monotonic()
+
+        while time.monotonic() < deadline:
+            await asyncio.sleep(delay + random.uniform(0, POLL_JITTER))
+            delay = min(delay * POLL_BACKOFF, self.POLL_MAX_DELAY)
+            attempt += 1
+
+            try:
+                generation = await client.generations.get(generation_id=generation_id)
+            except APIConnectionError as e:
+                # The SDK has already retried this request; keep polling until the deadline so a
+                # network blip doesn't abandon a generation that is still running.
+                self._queue_status(f"Attempt {attempt}: connection error ({e}), retrying\n")
+                continue
+
+            if generation.state == "completed":
+                self._queue_status(f"Attempt {attempt}: Completed!\n")
+                self._flush_status()
+                return generation
+            if generation.state == "failed":
+                raise RuntimeError(f"{self.OPERATION} failed: {generation.failure_reason}")
+            self._queue_status(f"Attempt {attempt}: {generation.state}\n")
+
+        self._flush_status()
+        raise TimeoutError(f"{self.OPERATION} timed out after {self.POLL_TIMEOUT:.0f} seconds ({attempt} attempts)")
+
+    def _report_failure(self, error: Exception) -> None:
+        """Publish a failed run to the status output."""
+        self._flush_status()
+        self.append_value_to_parameter("status", f"❌ {self.OPERATION} failed: {error!s}\n")
+
+    def _queue_status(self, line: str) -> None:
+        """Buffer a status line, publishing the buffer at most once per STATUS_FLUSH_INTERVAL."""
+        self._status_buffer.append(line)
+        if time.monotonic() - self._status_last_flush >= STATUS_FLUSH_INTERVAL:
+            self._flush_status()
+
+    def _flush_status(self) -> None:
+        """Publish any buffered status lines as a single update."""
+        if self._status_buffer:
+            self.append_value_to_parameter("status", "".join(self._status_buffer))
+            self._status_buffer.clear()
+        self._status_last_flush = time.monotonic()
+
+    async def _download_video(self, video_url: str, dest: FileDestination) -> File:
+        """Stream video from URL into the destination file and return the saved file.
+
+        The video is downloaded into a temporary file beside the destination and only moved into place once
+        complete, so a failed download never leaves a truncated video or replaces an earlier output.
+        """
+        partial_path, partial = await asyncio.to_thread(_open_partial_file, dest)
+        try:
+            with partial:
+                async with asyncio.timeout(DOWNLOAD_DEADLINE), get_http_client().stream("GET", video_url) as response:
+                    response.raise_for_status()
+                    async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                        await asyncio.to_thread(partial.write, chunk)
+                size = partial.tell()
+            if not size:
+                raise ValueError(f"Downloaded video is empty: {video_url}")
+
+            # Writing an empty file applies the destination's existing-file policy and claims the final path;
+            # the finished download then replaces it with a rename rather than a copy. mkstemp creates the
+            # partial file owner-only, so take the claimed file's normal permissions before the rename.
+            saved = await asyncio.to_thread(dest.write_bytes, b"")
+            saved_path = saved.resolve()
+            await asyncio.to_thread(shutil.copymode, saved_path, partial_path)
+            await asyncio.to_thread(os.replace, partial_path, saved_path)
+        except TimeoutError as e:
+            raise TimeoutError(f"Video download did not finish within {DOWNLOAD_DEADLINE:.0f} seconds") from e
+        finally:
+            await asyncio.to_thread(partial_path.unlink, missing_ok=True)
+        return saved
@@ -7,23 +7,22 @@ from griptape_nodes.exe_types.core_types import (
     ParameterMode,
     ParameterTypeBuiltin,
 )
-from griptape_nodes.exe_types.node_types import AsyncResult, ControlNode
 from griptape_nodes.exe_types.param_components.artifact_url.public_artifact_url_parameter import (
     PublicArtifactUrlParameter,
 )
 from griptape_nodes.exe_types.param_components.project_file_parameter import ProjectFileParameter
-from griptape_nodes.files.file import File
-from griptape_nodes.retained_mode.griptape_nodes import GriptapeNodes
 from griptape_nodes.traits.options import Options
-from luma_agents import AsyncLuma
+from luma_base import API_KEY_ENV_VAR, LumaNode, gather_settled, get_luma_client, lookup_api_key
 
-SERVICE = "Luma Labs"
-API_KEY_ENV_VAR = "LUMA_AGENTS_API_KEY"
 
-
-class LumaVideoGeneration(ControlNode):
+class LumaVideoGeneration(LumaNode):
     """Luma Labs Ray video generation node supporting text-to-video and image-to-video."""
 
+    # Video generations take a while, so the first poll waits a little longer before backing off.
+    POLL_INITIAL_DELAY = 2.0
+    POLL_MAX_DELAY = 10.0
+    POLL_TIMEOUT = 600.0
+
     def __init__(self, name: str, metadata: dict[Any, Any] | None = None) -> None:
         super().__init__(name, metadata)
 
@@ -166,16 +165,6 @@ class LumaVideoGeneration(ControlNode):
         )
         self._output_file.add_parameter()
 
-    def _get_api_key(self) -> str:
-        """Retrieve the Luma API key from configuration."""
-        api_key = GriptapeNodes.SecretsManager().get_secret(API_KEY_ENV_VAR)
-        if not api_key:
-            raise ValueError(
-                f"Luma API key not found. Please set the {API_KEY_ENV_VAR} environment variable.\n"
-                "Get your API key from: https://platform.lumalabs.ai"
-            )
-        return api_key
-
     def validate_before_node_run(self) -> list[Exception] | None:
         """Validate node configuration before execution."""
         errors = []
@@ -184,7 +173,7 @@ class LumaVideoGeneration(ControlNode):
         if not prompt:
             errors.append(ValueError(f"{self.name}: Provide a prompt for video generation."))
 
-        api_key = GriptapeNodes.SecretsManager().get_secret(API_KEY_ENV_VAR)
+        api_key = lookup_api_key()
         if not api_key:
             errors.append(
                 ValueError(
@@ -194,28 +183,15 @@ class LumaVideoGeneration(ControlNode):
 
         return errors if errors else None
 
-    def validate_before_workflow_run(self) -> list[Exception] | None:
-        return self.validate_before_node_run()
-
-    def process(self) -> AsyncResult[None]:
-        """Non-blocking entry point for Griptape engine."""
-        yield lambda: self._process_sync()
-
-    def _process_sync(self) -> None:
-        """Synchronous wrapper that runs async code."""
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            loop.run_until_complete(self._process_async())
-        finally:
-            loop.close()
+    # Workflow-level validation checks the same things as node-level validation
+    validate_before_workflow_run = validate_before_node_run
 
     async def _process_async(self) -> None:
         """Generate video using Luma async API."""
-        client = None
         try:
-            api_key = self._get_api_key()
-            client = AsyncLuma(auth_token=api_key)
+            # The secrets lookup may read .env files from disk
+            api_key = await asyncio.to_thread(self._get_api_key)
+            client = get_luma_client(api_key)
 
             prompt = self.get_parameter_value("prompt")
             if not prompt:
@@ -229,56 +205,36 @@ class LumaVideoGeneration(ControlNode):
 
             self.append_value_to_parameter("status", "Creating generation request...\n")
 
-            # Build request parameters for the video generation type
+            if loop_video:
+                self.append_value_to_parameter("status", "Loop mode enabled\n")
+
+            # Resolve optional start and end frames to public URLs, uploading both concurrently. Wait for both
+            # to settle, so one failed upload can't leave the other running past the cleanup below.
+            start_frame_url, end_frame_url = await gather_settled(
+                self._get_public_url("start_frame", self._public_start_frame_parameter, ImageUrlArtifact),
+                self._get_public_url("end_frame", self._public_end_frame_parameter, ImageUrlArtifact),
+            )
+            if start_frame_url:
+                self.append_value_to_parameter("status", f"Using start frame: {start_frame_url}\n")
+            if end_frame_url:
+                self.append_value_to_parameter("status", f"Using end frame: {end_frame_url}\n")
+
+            # Build request parameters for the video generation type in one go. Video-specific output
+            # settings live under the `video` options object.
             params = {
                 "type": "video",
                 "prompt": prompt.strip(),
                 "model": model,
+                **({"aspect_ratio": aspect_ratio} if aspect_ratio else {}),
+                "video": {
+                    "resolution": resolution,
+                    "duration": duration,
+                    **({"loop": True} if loop_video else {}),
+                    **({"start_frame": {"url": start_frame_url}} if start_frame_url else {}),
+                    **({"end_frame": {"url": end_frame_url}} if end_frame_url else {}),
+                },
             }
 
-            if aspect_ratio:
-                params["aspect_ratio"] = aspect_ratio
-
-            # Video-specific output settings live under the `video` options object
-            video_options: dict = {
-                "resolution": resolution,
-                "duration": duration,
-            }
-
-            # Add loop if enabled
-            if loop_video:
-                video_options["loop"] = True
-                self.append_value_to_parameter("status", "Loop mode enabled\n")
-
-            # Add optional start and end frames
-            start_frame = self.get_parameter_value("start_frame")
-            if start_frame:
-                # Convert serialized dicts back to artifacts if needed
-                if isinstance(start_frame, dict) and start_frame.get("value"):
-                    start_frame = ImageUrlArtifact(
-                        value=start_frame["value"], name=start_frame.get("name", "start_frame")
-                    )
-                    self.set_parameter_value("start_frame", start_frame)
-
-                start_frame_url = self._public_start_frame_parameter.get_public_url_for_parameter()
-                if start_frame_url:
-                    video_options["start_frame"] = {"url": start_frame_url}
-                    self.append_value_to_parameter("status", f"Using start frame: {start_frame_url}\n")
-
-            end_frame = self.get_parameter_value("end_frame")
-            if end_frame:
-                # Convert serialized dicts back to artifacts if needed
-                if isinstance(end_frame, dict) and end_frame.get("value"):
-                    end_frame = ImageUrlArtifact(value=end_frame["value"], name=end_frame.get("name", "end_frame"))
-                    self.set_parameter_value("end_frame", end_frame)
-
-                end_frame_url = self._public_end_frame_parameter.get_public_url_for_parameter()
-                if end_frame_url:
-                    video_options["end_frame"] = {"url": end_frame_url}
-                    self.append_value_to_parameter("status", f"Using end frame: {end_frame_url}\n")
-
-            params["video"] = video_options
-
             # Create generation
             generation = await client.generations.create(**params)
             generation_id = generation.id
@@ -288,36 +244,17 @@ class LumaVideoGeneration(ControlNode):
             # Poll for completion
             self.append_value_to_parameter("status", "Waiting for generation to complete...\n")
 
-            completed = False
-            max_attempts = 200
-            attempt = 0
-
-            while not completed and attempt < max_attempts:
-                await asyncio.sleep(3)
-                attempt += 1
-
-                generation = await client.generations.get(generation_id=generation_id)
-
-                if generation.state == "completed":
-                    completed = True
-                    self.append_value_to_parameter("status", f"Attempt {attempt}: Completed!\n")
-                elif generation.state == "failed":
-                    raise RuntimeError(f"Generation failed: {generation.failure_reason}")
-                else:
-                    self.append_value_to_parameter("status", f"Attempt {attempt}: {generation.state}\n")
-
-            if not completed:
-                raise TimeoutError(f"Generation timed out after {max_attempts} attempts")
+            generation = await self._wait_for_generation(client, generation_id)
 
             # Download and save video from the generation output list
             video_url = generation.output[0].url
 
             self.append_value_to_parameter("status", "Downloading generated video...\n")
-            video_bytes = self._download_video(video_url)
 
-            # Save to project files
-            dest = self._output_file.build_file()
-            saved = dest.write_bytes(video_bytes)
+            # Stream into project files. Resolving the destination goes through the engine's
+            # synchronous request handlers.
+            dest = await asyncio.to_thread(self._output_file.build_file)
+            saved = await self._download_video(video_url, dest)
 
             video_artifact = VideoUrlArtifact(value=saved.location)
             self.parameter_output_values["video"] = video_artifact
@@ -329,18 +266,8 @@ class LumaVideoGeneration(ControlNode):
             )
 
         except Exception as e:
-            error_msg = f"❌ Generation failed: {str(e)}\n"
-            self.append_value_to_parameter("status", error_msg)
+            self._report_failure(e)
             raise
         finally:
-            # Close the async client while the event loop is still alive to avoid
-            # "Event loop is closed" errors when httpx is finalized during GC.
-            if client is not None:
-                await client.close()
             # Cleanup uploaded artifacts
-            self._public_start_frame_parameter.delete_uploaded_artifact()
-            self._public_end_frame_parameter.delete_uploaded_artifact()
-
-    def _download_video(self, video_url: str) -> bytes:
-        """Download video from URL and return bytes."""
-        return File(video_url).read_bytes()
+            await self._delete_uploaded_artifacts(self._public_start_frame_parameter, self._public_end_frame_parameter)
@@ -8,23 +8,19 @@ from griptape_nodes.exe_types.core_types import (
     ParameterMode,
     ParameterTypeBuiltin,
 )
-from griptape_nodes.exe_types.node_types import AsyncResult, ControlNode
 from griptape_nodes.exe_types.param_components.artifact_url.public_artifact_url_parameter import (
     PublicArtifactUrlParameter,
 )
 from griptape_nodes.exe_types.param_components.project_file_parameter import ProjectFileParameter
-from griptape_nodes.files.file import File
-from griptape_nodes.retained_mode.griptape_nodes import GriptapeNodes
 from griptape_nodes.traits.options import Options
-from luma_agents import AsyncLuma
+from luma_base import API_KEY_ENV_VAR, LumaNode, get_luma_client, lookup_api_key
 
-SERVICE = "Luma Labs"
-API_KEY_ENV_VAR = "LUMA_AGENTS_API_KEY"
 
-
-class LumaVideoModify(ControlNode):
+class LumaVideoModify(LumaNode):
     """Luma Labs Ray video modification node for style transfer and prompt-based editing."""
 
+    OPERATION = "Modification"
+
     def __init__(self, name: str, metadata: dict[Any, Any] | None = None) -> None:
         super().__init__(name, metadata)
 
@@ -151,16 +147,6 @@ class LumaVideoModify(ControlNode):
         )
         self._output_file.add_parameter()
 
-    def _get_api_key(self) -> str:
-        """Retrieve the Luma API key from configuration."""
-        api_key = GriptapeNodes.SecretsManager().get_secret(API_KEY_ENV_VAR)
-        if not api_key:
-            raise ValueError(
-                f"Luma API key not found. Please set the {API_KEY_ENV_VAR} environment variable.\n"
-                "Get your API key from: https://platform.lumalabs.ai"
-            )
-        return api_key
-
     def validate_before_node_run(self) -> list[Exception] | None:
         """Validate node configuration before execution."""
         errors = []
@@ -173,7 +159,7 @@ class LumaVideoModify(ControlNode):
         if not prompt:
             errors.append(ValueError(f"{self.name}: Provide a prompt to guide the modification."))
 
-        api_key = GriptapeNodes.SecretsManager().get_secret(API_KEY_ENV_VAR)
+        api_key = lookup_api_key()
         if not api_key:
             errors.append(
                 ValueError(
@@ -183,39 +169,17 @@ class LumaVideoModify(ControlNode):
 
         return errors if errors else None
 
-    def validate_before_workflow_run(self) -> list[Exception] | None:
-        return self.validate_before_node_run()
-
-    def process(self) -> AsyncResult[None]:
-        """Non-blocking entry point for Griptape engine."""
-        yield lambda: self._process_sync()
-
-    def _process_sync(self) -> None:
-        """Synchronous wrapper that runs async code."""
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            loop.run_until_complete(self._process_async())
-        finally:
-            loop.close()
+    # Workflow-level validation checks the same things as node-level validation
+    validate_before_workflow_run = validate_before_node_run
 
     async def _process_async(self) -> None:
         """Modify video using Luma async API."""
-        client = None
         try:
-            api_key = self._get_api_key()
-            client = AsyncLuma(auth_token=api_key)
-
-            # Convert serialized dict back to artifact if needed
-            input_video = self.get_parameter_value("input_video")
-            if isinstance(input_video, dict) and input_video.get("value"):
-                # Create proper artifact from serialized dict
-                input_video = VideoUrlArtifact(value=input_video["value"], name=input_video.get("name", "input_video"))
-                # Update the parameter with the artifact object
-                self.set_parameter_value("input_video", input_video)
-
-            # Let PublicArtifactUrlParameter handle getting and converting the artifact
-            video_url = self._public_input_video_parameter.get_public_url_for_parameter()
+            # The secrets lookup may read .env files from disk
+            api_key = await asyncio.to_thread(self._get_api_key)
+            client = get_luma_client(api_key)
+
+            video_url = await self._get_public_url("input_video", self._public_input_video_parameter, VideoUrlArtifact)
             if not video_url:
                 raise ValueError("Input video is required")
 
@@ -234,19 +198,12 @@ class LumaVideoModify(ControlNode):
             video_options: dict = {"edit": {"strength": mode}}
 
             # Add optional first frame
-            first_frame = self.get_parameter_value("first_frame")
-            if first_frame:
-                # Convert serialized dict back to artifact if needed
-                if isinstance(first_frame, dict) and first_frame.get("value"):
-                    first_frame = ImageUrlArtifact(
-                        value=first_frame["value"], name=first_frame.get("name", "first_frame")
-                    )
-                    self.set_parameter_value("first_frame", first_frame)
-
-                first_frame_url = self._public_first_frame_parameter.get_public_url_for_parameter()
-                if first_frame_url:
-                    video_options["start_frame"] = {"url": first_frame_url}
-                    self.append_value_to_parameter("status", f"Using first frame: {first_frame_url}\n")
+            first_frame_url = await self._get_public_url(
+                "first_frame", self._public_first_frame_parameter, ImageUrlArtifact
+            )
+            if first_frame_url:
+                video_options["start_frame"] = {"url": first_frame_url}
+                self.append_value_to_parameter("status", f"Using first frame: {first_frame_url}\n")
 
             params = {
                 "type": "video_edit",
@@ -268,36 +225,17 @@ class LumaVideoModify(ControlNode):
             # Poll for completion
             self.append_value_to_parameter("status", "Waiting for modification to complete...\n")
 
-            completed = False
-            max_attempts = 180  # Videos take longer
-            attempt = 0
-
-            while not completed and attempt < max_attempts:
-                await asyncio.sleep(3)
-                attempt += 1
-
-                generation = await client.generations.get(generation_id=generation_id)
-
-                if generation.state == "completed":
-                    completed = True
-                    self.append_value_to_parameter("status", f"Attempt {attempt}: Completed!\n")
-                elif generation.state == "failed":
-                    raise RuntimeError(f"Modification failed: {generation.failure_reason}")
-                else:
-                    self.append_value_to_parameter("status", f"Attempt {attempt}: {generation.state}\n")
-
-            if not completed:
-                raise TimeoutError(f"Modification timed out after {max_attempts} attempts")
+            generation = await self._wait_for_generation(client, generation_id)
 
             # Get video URL from the generation output list
             video_url = generation.output[0].url
 
             self.append_value_to_parameter("status", "Downloading modified video...\n")
-            video_bytes = self._download_video(video_url)
 
-            # Save to project files
-            dest = self._output_file.build_file()
-            saved = dest.write_bytes(video_bytes)
+            # Stream into project files. Resolving the destination goes through the engine's
+            # synchronous request handlers.
+            dest = await asyncio.to_thread(self._output_file.build_file)
+            saved = await self._download_video(video_url, dest)
 
             video_artifact = VideoUrlArtifact(value=saved.location)
             self.parameter_output_values["output_video"] = video_artifact
@@ -309,18 +247,10 @@ class LumaVideoModify(ControlNode):
             )
 
         except Exception as e:
-            error_msg = f"❌ Modification failed: {str(e)}\n"
-            self.append_value_to_parameter("status", error_msg)
+            self._report_failure(e)
             raise
         finally:
-            # Close the async client while the event loop is still alive to avoid
-            # "Event loop is closed" errors when httpx is finalized during GC.
-            if client is not None:
-                await client.close()
             # Cleanup uploaded artifacts
-            self._public_input_video_parameter.delete_uploaded_artifact()
-            self._public_first_frame_parameter.delete_uploaded_artifact()
-
-    def _download_video(self, video_url: str) -> bytes:
-        """Download video from URL and return bytes."""
-        return File(video_url).read_bytes()
+            await self._delete_uploaded_artifacts(
+                self._public_input_video_parameter, self._public_first_frame_parameter
+            )
@@ -9,23 +9,22 @@ from griptape_nodes.exe_types.core_types import (
     ParameterMode,
     ParameterTypeBuiltin,
 )
-from griptape_nodes.exe_types.node_types import AsyncResult, ControlNode
 from griptape_nodes.exe_types.param_components.artifact_url.public_artifact_url_parameter import (
     PublicArtifactUrlParameter,
 )
 from griptape_nodes.exe_types.param_components.project_file_parameter import ProjectFileParameter
-from griptape_nodes.files.file import File
-from griptape_nodes.retained_mode.griptape_nodes import GriptapeNodes
 from griptape_nodes.traits.options import Options
-from luma_agents import AsyncLuma
+from luma_base import API_KEY_ENV_VAR, LumaNode, gather_settled, get_luma_client, lookup_api_key
 
-SERVICE = "Luma Labs"
-API_KEY_ENV_VAR = "LUMA_AGENTS_API_KEY"
+# Advanced parameters forming the source_position rectangle, in request field order.
+SOURCE_POSITION_KEYS = ("x_norm", "y_norm", "w_norm", "h_norm")
 
 
-class LumaVideoReframe(ControlNode):
+class LumaVideoReframe(LumaNode):
     """Luma Labs Ray video reframing node for changing aspect ratios and extending videos."""
 
+    OPERATION = "Reframe"
+
     def __init__(self, name: str, metadata: dict[Any, Any] | None = None) -> None:
         super().__init__(name, metadata)
 
@@ -156,16 +155,6 @@ class LumaVideoReframe(ControlNode):
         )
         self._output_file.add_parameter()
 
-    def _get_api_key(self) -> str:
-        """Retrieve the Luma API key from configuration."""
-        api_key = GriptapeNodes.SecretsManager().get_secret(API_KEY_ENV_VAR)
-        if not api_key:
-            raise ValueError(
-                f"Luma API key not found. Please set the {API_KEY_ENV_VAR} environment variable.\n"
-                "Get your API key from: https://platform.lumalabs.ai"
-            )
-        return api_key
-
     def validate_before_node_run(self) -> list[Exception] | None:
         """Validate node configuration before execution."""
         errors = []
@@ -174,7 +163,7 @@ class LumaVideoReframe(ControlNode):
         if not input_video:
             errors.append(ValueError(f"{self.name}: Provide an input video to reframe."))
 
-        api_key = GriptapeNodes.SecretsManager().get_secret(API_KEY_ENV_VAR)
+        api_key = lookup_api_key()
         if not api_key:
             errors.append(
                 ValueError(
@@ -184,75 +173,53 @@ class LumaVideoReframe(ControlNode):
 
         return errors if errors else None
 
-    def validate_before_workflow_run(self) -> list[Exception] | None:
-        return self.validate_before_node_run()
-
-    def process(self) -> AsyncResult[None]:
-        """Non-blocking entry point for Griptape engine."""
-        yield lambda: self._process_sync()
-
-    def _process_sync(self) -> None:
-        """Synchronous wrapper that runs async code."""
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            loop.run_until_complete(self._process_async())
-        finally:
-            loop.close()
+    # Workflow-level validation checks the same things as node-level validation
+    validate_before_workflow_run = validate_before_node_run
 
     async def _process_async(self) -> None:
         """Reframe video using Luma async API."""
-        client = None
         try:
-            api_key = self._get_api_key()
-            client = AsyncLuma(auth_token=api_key)
-
-            # Convert serialized dict back to artifact if needed
-            input_video = self.get_parameter_value("input_video")
-            if isinstance(input_video, dict) and input_video.get("value"):
-                # Create proper artifact from serialized dict
-                input_video = VideoUrlArtifact(value=input_video["value"], name=input_video.get("name", "input_video"))
-                # Update the parameter with the artifact object
-                self.set_parameter_value("input_video", input_video)
-
-            # Let PublicArtifactUrlParameter handle getting and converting the artifact
-            video_url = self._public_input_video_parameter.get_public_url_for_parameter()
+            # The secrets lookup, the input upload and resolving the output destination are all blocking
+            # calls. Run them concurrently in worker threads, so the destination is ready by the time the
+            # video is. Wait for all three to settle, so a failure can't leave the upload running past the
+            # cleanup below.
+            api_key, video_url, dest = await gather_settled(
+                asyncio.to_thread(self._get_api_key),
+                self._get_public_url("input_video", self._public_input_video_parameter, VideoUrlArtifact),
+                asyncio.to_thread(self._output_file.build_file),
+            )
+            client = get_luma_client(api_key)
             if not video_url:
                 raise ValueError("Input video is required")
 
             model = self.get_parameter_value("model")
             aspect_ratio = self.get_parameter_value("aspect_ratio")
-            prompt = self.get_parameter_value("prompt")
+            prompt = (self.get_parameter_value("prompt") or "").strip()
 
             self.append_value_to_parameter("status", f"Using input video: {video_url}\n")
             self.append_value_to_parameter("status", "Creating reframe request...\n")
 
-            # Build request parameters for the video_reframe generation type
+            # Collect the optional request fields
+            optional_fields: dict[str, Any] = {}
+            if prompt:
+                optional_fields["prompt"] = prompt
+                self.append_value_to_parameter("status", f"Using prompt: {prompt}\n")
+
+            # Add optional source position (normalized rectangle) if a width/height is provided
+            if self.get_parameter_value("w_norm") or self.get_parameter_value("h_norm"):
+                source_position = {key: self.get_parameter_value(key) for key in SOURCE_POSITION_KEYS}
+                optional_fields["video"] = {"source_position": source_position}
+                self.append_value_to_parameter("status", f"Using source position: {source_position}\n")
+
+            # Build request parameters for the video_reframe generation type in one go
             params = {
                 "type": "video_reframe",
                 "model": model,
                 "aspect_ratio": aspect_ratio,
                 "source": {"url": video_url, "media_type": mimetypes.guess_type(video_url)[0] or "video/mp4"},
+                **optional_fields,
             }
 
-            # Add optional prompt
-            if prompt:
-                params["prompt"] = prompt.strip()
-                self.append_value_to_parameter("status", f"Using prompt: {prompt.strip()}\n")
-
-            # Add optional source position (normalized rectangle) if a width/height is provided
-            w_norm = self.get_parameter_value("w_norm")
-            h_norm = self.get_parameter_value("h_norm")
-            if w_norm != 0 or h_norm != 0:
-                source_position = {
-                    "x_norm": self.get_parameter_value("x_norm"),
-                    "y_norm": self.get_parameter_value("y_norm"),
-                    "w_norm": w_norm,
-                    "h_norm": h_norm,
-                }
-                params["video"] = {"source_position": source_position}
-                self.append_value_to_parameter("status", f"Using source position: {source_position}\n")
-
             # Create reframe generation
             generation = await client.generations.create(**params)
             generation_id = generation.id
@@ -262,36 +229,15 @@ class LumaVideoReframe(ControlNode):
             # Poll for completion
             self.append_value_to_parameter("status", "Waiting for reframe to complete...\n")
 
-            completed = False
-            max_attempts = 180  # Videos take longer than images
-            attempt = 0
-
-            while not completed and attempt < max_attempts:
-                await asyncio.sleep(3)  # Longer wait for videos
-                attempt += 1
-
-                generation = await client.generations.get(generation_id=generation_id)
-
-                if generation.state == "completed":
-                    completed = True
-                    self.append_value_to_parameter("status", f"Attempt {attempt}: Completed!\n")
-                elif generation.state == "failed":
-                    raise RuntimeError(f"Reframe failed: {generation.failure_reason}")
-                else:
-                    self.append_value_to_parameter("status", f"Attempt {attempt}: {generation.state}\n")
-
-            if not completed:
-                raise TimeoutError(f"Reframe timed out after {max_attempts} attempts")
+            generation = await self._wait_for_generation(client, generation_id)
 
             # Get video URL from the generation output list
             video_url = generation.output[0].url
 
             self.append_value_to_parameter("status", "Downloading reframed video...\n")
-            video_bytes = self._download_video(video_url)
 
-            # Save to project files
-            dest = self._output_file.build_file()
-            saved = dest.write_bytes(video_bytes)
+            # Stream into project files
+            saved = await self._download_video(video_url, dest)
 
             video_artifact = VideoUrlArtifact(value=saved.location)
             self.parameter_output_values["output_video"] = video_artifact
@@ -303,17 +249,8 @@ class LumaVideoReframe(ControlNode):
             )
 
         except Exception as e:
-            error_msg = f"❌ Reframe failed: {str(e)}\n"
-            self.append_value_to_parameter("status", error_msg)
+            self._report_failure(e)
             raise
         finally:
-            # Close the async client while the event loop is still alive to avoid
-            # "Event loop is closed" errors when httpx is finalized during GC.
-            if client is not None:
-                await client.close()
             # Cleanup uploaded artifacts
-            self._public_input_video_parameter.delete_uploaded_artifact()
-
-    def _download_video(self, video_url: str) -> bytes:
-        """Download video from URL and return bytes."""
-        return File(video_url).read_bytes()
+            await self._delete_uploaded_artifacts(self._public_input_video_parameter)